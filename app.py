@@ -1,71 +1,465 @@
+import atexit
+import hashlib
 import json
 import os
+import sys
+import threading
+import time
 import uuid
 from datetime import datetime
 from pathlib import Path
 
-from flask import Flask, jsonify, request
+import orjson
+from flask import Flask, request
 from werkzeug.exceptions import BadRequest
 
 app = Flask(__name__)
 
-# Directory to store trade JSON files
+# Directory holding the trade log (and any legacy per-trade JSON files)
 TRADES_DIR = "trades"
 Path(TRADES_DIR).mkdir(exist_ok=True)
 
+# Append-only log of trade records, one JSON object per line
+TRADES_LOG = "trades.jsonl"
+
+# Fields every trade must provide
+REQUIRED_FIELDS = ["symbol", "quantity", "price", "side"]
+_REQUIRED_FIELDS_SET = frozenset(REQUIRED_FIELDS)
+
+# Accepted values for a trade's side
+VALID_SIDES = frozenset(("BUY", "SELL"))
+
+# Maximum number of trades accepted by a single batch request
+MAX_BATCH_SIZE = 500
+
+# Number of trades encoded per chunk when streaming the all-trades listing
+STREAM_CHUNK_SIZE = 256
+
+# In-memory view of the trade log. _TRADES maps trade_id to the latest trade
+# and _INDEX maps trade_id to the (offset, length, etag) of that record in the
+# log, where etag is a hash of the record's bytes.
+# Both are rebuilt by replaying the log, so records appended by other worker
+# processes are picked up before each read.
+_TRADES: dict[str, dict] = {}
+_INDEX: dict[str, tuple[int, int, str]] = {}
+_TRADES_LOCK = threading.RLock()
+_LOG_FD = None
+_LOG_POS = 0
+
+# Durability is write-back: appends reach the OS page cache (and so other
+# workers) immediately, and a background thread group-commits them to disk with
+# one fdatasync per batch. The counters track records appended and records known
+# to be on disk; _SYNC_ERROR holds the last sync failure until a sync succeeds.
+_SYNC_LOCK = threading.Lock()
+_WRITES_DONE = threading.Condition(_TRADES_LOCK)
+_WRITES_APPENDED = 0
+_WRITES_SYNCED = 0
+_SYNC_ERROR = None
+_SYNCER = None
+
+# A sync is issued once this many records are waiting, or after SYNC_DELAY
+SYNC_BATCH_SIZE = 256
+SYNC_DELAY = 0.01
+# Pause before retrying a failed sync
+SYNC_RETRY_DELAY = 1.0
+# How long to wait at interpreter exit for outstanding syncs
+EXIT_FLUSH_TIMEOUT = 10.0
+
+# (epoch second, ISO string) for the most recent timestamp handed out
+_TIMESTAMP_CACHE = (0, "")
+
+# Constant error bodies, serialized once at import time
+_ERR_NO_JSON = orjson.dumps(
+    {
+        "error": "No JSON data provided",
+        "message": "Request body must contain valid JSON",
+    }
+)
+_ERR_INVALID_JSON = orjson.dumps(
+    {
+        "error": "Invalid JSON format",
+        "message": "Request body must contain valid JSON",
+    }
+)
+_ERR_NO_TRADES = orjson.dumps(
+    {
+        "error": "No trades provided",
+        "message": "Request body must be a non-empty JSON array of trades",
+    }
+)
+_ERR_NO_TRADE_IDS = orjson.dumps(
+    {
+        "error": "No trade IDs provided",
+        "message": "Request body must contain a non-empty trade_ids array of strings",
+    }
+)
+_ERR_BATCH_TOO_LARGE = orjson.dumps(
+    {
+        "error": "Batch too large",
+        "message": f"A batch may contain at most {MAX_BATCH_SIZE} trades",
+    }
+)
+_ERR_NOT_FOUND = orjson.dumps(
+    {
+        "error": "Endpoint not found",
+        "message": "The requested endpoint does not exist",
+    }
+)
+_ERR_METHOD_NOT_ALLOWED = orjson.dumps(
+    {
+        "error": "Method not allowed",
+        "message": "The request method is not allowed for this endpoint",
+    }
+)
+
+
+def json_response(payload, status=200):
+    """Wrap payload in a JSON response, serializing it unless already bytes"""
+    if not isinstance(payload, bytes):
+        payload = orjson.dumps(payload)
+    return app.response_class(payload, status=status, mimetype="application/json")
+
+
+# Shared responses for unmatched routes and methods. These are returned as-is
+# for every request, so nothing (e.g. after_request hooks) may mutate them.
+_NOT_FOUND_RESPONSE = json_response(_ERR_NOT_FOUND, 404)
+_METHOD_NOT_ALLOWED_RESPONSE = json_response(_ERR_METHOD_NOT_ALLOWED, 405)
+
+
+def now_iso():
+    """Current local time as an ISO string, recomputed at most once a second"""
+    global _TIMESTAMP_CACHE
+    second = int(time.time())
+    cached_second, cached = _TIMESTAMP_CACHE
+    if second != cached_second:
+        cached = datetime.fromtimestamp(second).isoformat()
+        _TIMESTAMP_CACHE = (second, cached)
+    return cached
+
+
+def new_trade_ids(count):
+    """Generate count random UUID4 trade IDs from a single urandom call"""
+    random_bytes = os.urandom(16 * count)
+    return [
+        uuid.UUID(bytes=random_bytes[start : start + 16], version=4).hex
+        for start in range(0, len(random_bytes), 16)
+    ]
+
+
+def validate_trade(trade_data):
+    """Return an error payload for an invalid trade, or None if it is valid"""
+    missing = _REQUIRED_FIELDS_SET.difference(trade_data)
+    if missing:
+        return {
+            "error": "Missing required fields",
+            "missing_fields": [field for field in REQUIRED_FIELDS if field in missing],
+            "required_fields": REQUIRED_FIELDS,
+        }
+
+    side = trade_data["side"]
+    if not isinstance(side, str) or side not in VALID_SIDES:
+        return {
+            "error": "Invalid side",
+            "message": f"side must be one of: {', '.join(sorted(VALID_SIDES))}",
+        }
+
+    return None
+
+
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+
+def _read_at(fd, offset, length):
+    """Read length bytes at offset without moving a shared file position"""
+    if hasattr(os, "pread"):
+        return os.pread(fd, length, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, length)
+
 
 class TradeManager:
+    @staticmethod
+    def _log_fd():
+        """Open the trade log on first use, importing legacy trade files"""
+        global _LOG_FD, _LOG_POS, _SYNCER
+        with _TRADES_LOCK:
+            if _SYNCER is None or not _SYNCER.is_alive():
+                _SYNCER = threading.Thread(
+                    target=TradeManager._sync_loop, name="trade-log-sync", daemon=True
+                )
+                _SYNCER.start()
+            if _LOG_FD is None:
+                log_path = os.path.join(TRADES_DIR, TRADES_LOG)
+                flags = (
+                    os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+                )
+                _LOG_FD = os.open(log_path, flags, 0o644)
+                _LOG_POS = 0
+                TradeManager._terminate_partial_record()
+                _TRADES.clear()
+                _INDEX.clear()
+                TradeManager._replay_log()
+                TradeManager._import_legacy_files()
+            return _LOG_FD
+
+    @staticmethod
+    def _terminate_partial_record():
+        """End a record cut short by a crash or short write with a newline
+
+        Replay then skips the partial record instead of reading it joined to
+        the next append. A concurrent append finishes first, in which case the
+        newline only adds a blank line.
+        """
+        size = os.fstat(_LOG_FD).st_size
+        if size and _read_at(_LOG_FD, size - 1, 1) != b"\n":
+            app.logger.warning(
+                "Terminating a partial record at the end of the trade log"
+            )
+            os.write(_LOG_FD, b"\n")
+
+    @staticmethod
+    def _replay_log():
+        """Apply any complete records appended to the log since the last call"""
+        global _LOG_POS
+        with _TRADES_LOCK:
+            size = os.fstat(_LOG_FD).st_size
+            if size <= _LOG_POS:
+                return
+
+            data = _read_at(_LOG_FD, _LOG_POS, size - _LOG_POS)
+            # Leave a partially written trailing record for the next replay
+            end = data.rfind(b"\n") + 1
+            offset = _LOG_POS
+            for line in data[:end].splitlines(keepends=True):
+                try:
+                    record = orjson.loads(line)
+                    trade_id = record["trade_id"]
+                except (orjson.JSONDecodeError, KeyError, TypeError):
+                    if line.strip():
+                        app.logger.warning(
+                            "Skipping unreadable trade log record at offset %d", offset
+                        )
+                    offset += len(line)
+                    continue
+                if record.get("_deleted"):
+                    _TRADES.pop(trade_id, None)
+                    _INDEX.pop(trade_id, None)
+                else:
+                    _TRADES[trade_id] = record
+                    etag = hashlib.blake2b(line, digest_size=8).hexdigest()
+                    _INDEX[trade_id] = (offset, len(line), etag)
+                offset += len(line)
+            _LOG_POS += end
+
+    @staticmethod
+    def _append(record):
+        """Append a single record to the log and refresh the in-memory view
+
+        The record is not yet on disk when this returns; see flush().
+        """
+        global _WRITES_APPENDED
+        line = orjson.dumps(record) + b"\n"
+        with _TRADES_LOCK:
+            # Refuse new writes rather than acknowledge ones that cannot be synced
+            if _SYNC_ERROR is not None:
+                raise OSError(f"Trade log cannot be synced to disk: {_SYNC_ERROR}")
+            fd = TradeManager._log_fd()
+            written = os.write(fd, line)
+            if written != len(line):
+                # Terminate the partial record so it cannot swallow the next one
+                try:
+                    os.write(fd, b"\n")
+                except OSError:
+                    pass
+                raise OSError(
+                    f"Short write to trade log: {written} of {len(line)} bytes"
+                )
+            TradeManager._replay_log()
+            _WRITES_APPENDED += 1
+            _WRITES_DONE.notify_all()
+
+    @staticmethod
+    def _sync_loop():
+        """Group-commit appended records with one fdatasync per batch"""
+        global _WRITES_SYNCED, _SYNC_ERROR
+        while True:
+            try:
+                with _WRITES_DONE:
+                    _WRITES_DONE.wait_for(lambda: _WRITES_APPENDED > _WRITES_SYNCED)
+                    # Give concurrent requests a moment to join this batch
+                    _WRITES_DONE.wait_for(
+                        lambda: _WRITES_APPENDED - _WRITES_SYNCED >= SYNC_BATCH_SIZE,
+                        timeout=SYNC_DELAY,
+                    )
+                    target = _WRITES_APPENDED
+                with _SYNC_LOCK:
+                    if _LOG_FD is not None:
+                        _fdatasync(_LOG_FD)
+                with _WRITES_DONE:
+                    _WRITES_SYNCED = max(_WRITES_SYNCED, target)
+                    _SYNC_ERROR = None
+                    _WRITES_DONE.notify_all()
+            except Exception as e:
+                app.logger.exception("Failed to sync trade log, retrying")
+                with _WRITES_DONE:
+                    _SYNC_ERROR = e
+                    _WRITES_DONE.notify_all()
+                time.sleep(SYNC_RETRY_DELAY)
+
+    @staticmethod
+    def flush(timeout=None):
+        """Block until every record appended so far has been synced to disk
+
+        Raises OSError if syncing is failing, or TimeoutError if it does not
+        finish within timeout seconds.
+        """
+        with _WRITES_DONE:
+            target = _WRITES_APPENDED
+            _WRITES_DONE.wait_for(
+                lambda: _WRITES_SYNCED >= target or _SYNC_ERROR is not None, timeout
+            )
+            if _WRITES_SYNCED >= target:
+                return
+            if _SYNC_ERROR is not None:
+                raise OSError(
+                    f"Trade log cannot be synced to disk: {_SYNC_ERROR}"
+                ) from _SYNC_ERROR
+            raise TimeoutError("Timed out waiting for the trade log to sync")
+
+    @staticmethod
+    def _flush_at_exit():
+        """Give outstanding syncs a chance to finish before the process exits"""
+        try:
+            TradeManager.flush(timeout=EXIT_FLUSH_TIMEOUT)
+        except OSError:
+            app.logger.exception("Trade log was not fully synced at exit")
+
+    @staticmethod
+    def _import_legacy_files():
+        """Move trades stored as one JSON file per trade into the log"""
+        with os.scandir(TRADES_DIR) as entries:
+            legacy = [
+                entry
+                for entry in entries
+                if entry.name.endswith(".json") and entry.is_file(follow_symlinks=False)
+            ]
+        imported = []
+        for entry in legacy:
+            # Another worker may be importing the same files concurrently
+            try:
+                with open(entry.path, "rb") as f:
+                    trade = orjson.loads(f.read())
+            except FileNotFoundError:
+                continue
+            trade.setdefault("trade_id", entry.name[: -len(".json")])
+            if trade["trade_id"] not in _INDEX:
+                TradeManager._append(trade)
+            imported.append(entry.path)
+
+        # Only remove the originals once their records are safely on disk
+        TradeManager.flush()
+        for path in imported:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
     @staticmethod
     def save_trade(trade_data):
-        """Save trade data to a JSON file"""
+        """Append trade data to the trade log"""
         trade_id = trade_data.get("trade_id")
         if not trade_id:
-            trade_id = str(uuid.uuid4())
+            trade_id = uuid.uuid4().hex
             trade_data["trade_id"] = trade_id
 
         # Add timestamp if not present
         if "timestamp" not in trade_data:
-            trade_data["timestamp"] = datetime.now().isoformat()
+            trade_data["timestamp"] = now_iso()
 
-        file_path = os.path.join(TRADES_DIR, f"{trade_id}.json")
-        with open(file_path, "w") as f:
-            json.dump(trade_data, f, indent=2)
+        TradeManager._append(trade_data)
 
         return trade_id
 
     @staticmethod
     def get_trade(trade_id):
         """Get trade data by trade ID"""
-        file_path = os.path.join(TRADES_DIR, f"{trade_id}.json")
-        if os.path.exists(file_path):
-            with open(file_path, "r") as f:
-                return json.load(f)
-        return None
+        return TradeManager.get_trade_with_etag(trade_id)[0]
+
+    @staticmethod
+    def get_trade_with_etag(trade_id):
+        """Get (trade data, ETag) by trade ID, or (None, None) if it does not exist
+
+        Both come from a single index lookup, so the ETag always matches the data.
+        """
+        with _TRADES_LOCK:
+            fd = TradeManager._log_fd()
+            TradeManager._replay_log()
+            location = _INDEX.get(trade_id)
+            if location is None:
+                return None, None
+
+            offset, length, etag = location
+            line = _read_at(fd, offset, length)
+        return orjson.loads(line), etag
 
     @staticmethod
     def get_all_trades():
         """Get all trades"""
-        trades = []
-        if os.path.exists(TRADES_DIR):
-            for filename in os.listdir(TRADES_DIR):
-                if filename.endswith(".json"):
-                    file_path = os.path.join(TRADES_DIR, filename)
-                    with open(file_path, "r") as f:
-                        trades.append(json.load(f))
-        return trades
+        with _TRADES_LOCK:
+            TradeManager._log_fd()
+            TradeManager._replay_log()
+            return list(_TRADES.values())
+
+    @staticmethod
+    def delete_trade(trade_id):
+        """Delete a trade, returning False if it does not exist"""
+        with _TRADES_LOCK:
+            TradeManager._log_fd()
+            TradeManager._replay_log()
+            if trade_id not in _INDEX:
+                return False
+
+            TradeManager._append({"trade_id": trade_id, "_deleted": True})
+        return True
+
+    @staticmethod
+    def compact_log():
+        """Rewrite the log keeping only the latest record of each live trade
+
+        Run this while no other process is writing to the log.
+        """
+        global _LOG_FD
+        TradeManager._log_fd()
+        TradeManager.flush()
+        with _SYNC_LOCK, _TRADES_LOCK:
+            TradeManager._replay_log()
+
+            log_path = os.path.join(TRADES_DIR, TRADES_LOG)
+            tmp_path = f"{log_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                for trade in _TRADES.values():
+                    f.write(orjson.dumps(trade) + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.close(_LOG_FD)
+            _LOG_FD = None
+            os.replace(tmp_path, log_path)
+        TradeManager._log_fd()
+
+
+atexit.register(TradeManager._flush_at_exit)
 
 
 @app.route("/health", methods=["GET"])
 def health_check():
     """Health check endpoint"""
-    return (
-        jsonify(
-            {
-                "status": "healthy",
-                "message": "Transaction Management API is running",
-                "timestamp": datetime.now().isoformat(),
-            }
-        ),
+    return json_response(
+        {
+            "status": "healthy",
+            "message": "Transaction Management API is running",
+            "timestamp": now_iso(),
+        },
         200,
     )
 
@@ -77,90 +471,150 @@ def create_trade():
         trade_data = request.get_json()
 
         if not trade_data:
-            return (
-                jsonify(
-                    {
-                        "error": "No JSON data provided",
-                        "message": "Request body must contain valid JSON",
-                    }
-                ),
-                400,
-            )
-
-        # Validate required fields (you can customize these)
-        required_fields = ["symbol", "quantity", "price", "side"]
-        missing_fields = [field for field in required_fields if field not in trade_data]
+            return json_response(_ERR_NO_JSON, 400)
 
-        if missing_fields:
-            return (
-                jsonify(
-                    {
-                        "error": "Missing required fields",
-                        "missing_fields": missing_fields,
-                        "required_fields": required_fields,
-                    }
-                ),
-                400,
-            )
+        error = validate_trade(trade_data)
+        if error:
+            return json_response(error, 400)
 
         trade_id = TradeManager.save_trade(trade_data)
 
-        return (
-            jsonify(
-                {
-                    "message": "Trade created successfully",
-                    "trade_id": trade_id,
-                    "trade_data": trade_data,
-                }
-            ),
+        return json_response(
+            {
+                "message": "Trade created successfully",
+                "trade_id": trade_id,
+                "trade_data": trade_data,
+            },
             201,
         )
 
     except BadRequest:
-        return (
-            jsonify(
-                {
-                    "error": "Invalid JSON format",
-                    "message": "Request body must contain valid JSON",
-                }
-            ),
-            400,
-        )
+        return json_response(_ERR_INVALID_JSON, 400)
     except json.JSONDecodeError:
-        return (
-            jsonify(
-                {
-                    "error": "Invalid JSON format",
-                    "message": "Request body must contain valid JSON",
-                }
-            ),
-            400,
+        return json_response(_ERR_INVALID_JSON, 400)
+    except Exception as e:
+        return json_response({"error": "Internal server error", "message": str(e)}, 500)
+
+
+@app.route("/api/trades/batch", methods=["POST"])
+def create_trades_batch():
+    """Create several trades from a JSON array in one request"""
+    try:
+        trades = request.get_json()
+
+        if not isinstance(trades, list) or not trades:
+            return json_response(_ERR_NO_TRADES, 400)
+
+        if len(trades) > MAX_BATCH_SIZE:
+            return json_response(_ERR_BATCH_TOO_LARGE, 400)
+
+        # Validate the whole batch before saving anything
+        for index, trade_data in enumerate(trades):
+            if not isinstance(trade_data, dict):
+                return json_response(
+                    {
+                        "error": "Invalid trade",
+                        "index": index,
+                        "message": "Each trade must be a JSON object",
+                    },
+                    400,
+                )
+            error = validate_trade(trade_data)
+            if error:
+                error["index"] = index
+                return json_response(error, 400)
+
+        # Draw IDs for the whole batch at once rather than one urandom per trade
+        unassigned = [
+            trade_data for trade_data in trades if not trade_data.get("trade_id")
+        ]
+        for trade_data, trade_id in zip(unassigned, new_trade_ids(len(unassigned))):
+            trade_data["trade_id"] = trade_id
+
+        trade_ids = [TradeManager.save_trade(trade_data) for trade_data in trades]
+
+        return json_response(
+            {
+                "message": f"Created {len(trade_ids)} trades",
+                "count": len(trade_ids),
+                "trade_ids": trade_ids,
+            },
+            201,
         )
+
+    except BadRequest:
+        return json_response(_ERR_INVALID_JSON, 400)
+    except Exception as e:
+        return json_response({"error": "Internal server error", "message": str(e)}, 500)
+
+
+@app.route("/api/trades/batch/delete", methods=["POST"])
+def delete_trades_batch():
+    """Delete several trades by ID in one request"""
+    try:
+        data = request.get_json()
+        trade_ids = data.get("trade_ids") if isinstance(data, dict) else None
+
+        if (
+            not isinstance(trade_ids, list)
+            or not trade_ids
+            or not all(isinstance(trade_id, str) for trade_id in trade_ids)
+        ):
+            return json_response(_ERR_NO_TRADE_IDS, 400)
+
+        if len(trade_ids) > MAX_BATCH_SIZE:
+            return json_response(_ERR_BATCH_TOO_LARGE, 400)
+
+        deleted = []
+        not_found = []
+        for trade_id in trade_ids:
+            if TradeManager.delete_trade(trade_id):
+                deleted.append(trade_id)
+            else:
+                not_found.append(trade_id)
+
+        return json_response(
+            {
+                "message": f"Deleted {len(deleted)} trades",
+                "count": len(deleted),
+                "deleted": deleted,
+                "not_found": not_found,
+            },
+            200,
+        )
+
+    except BadRequest:
+        return json_response(_ERR_INVALID_JSON, 400)
     except Exception as e:
-        return jsonify({"error": "Internal server error", "message": str(e)}), 500
+        return json_response({"error": "Internal server error", "message": str(e)}, 500)
 
 
 @app.route("/api/trades/<trade_id>", methods=["GET"])
 def get_trade(trade_id):
     """Get trade by trade ID"""
     try:
-        trade_data = TradeManager.get_trade(trade_id)
+        trade_data, etag = TradeManager.get_trade_with_etag(trade_id)
 
         if trade_data:
-            return jsonify({"message": "Trade found", "trade_data": trade_data}), 200
+            if request.if_none_match.contains(etag):
+                response = app.response_class(status=304)
+            else:
+                response = json_response(
+                    {"message": "Trade found", "trade_data": trade_data}, 200
+                )
+            response.set_etag(etag)
+            return response
         else:
-            return (
-                jsonify(
-                    {
-                        "error": "Trade not found",
-                        "message": f"No trade found with ID: {trade_id}",
-                    }
-                ),
+            return json_response(
+                {
+                    "error": "Trade not found",
+                    "message": f"No trade found with ID: {trade_id}",
+                },
                 404,
             )
 
     except Exception as e:
-        return jsonify({"error": "Internal server error", "message": str(e)}), 500
+        return json_response({"error": "Internal server error", "message": str(e)}, 500)
 
 
 @app.route("/api/trades", methods=["GET"])
@@ -169,19 +623,23 @@ def get_all_trades():
     try:
         trades = TradeManager.get_all_trades()
 
-        return (
-            jsonify(
-                {
-                    "message": f"Retrieved {len(trades)} trades",
-                    "count": len(trades),
-                    "trades": trades,
-                }
-            ),
-            200,
-        )
+        def generate():
+            # Same document as {"message", "count", "trades"}, encoded a chunk
+            # of trades at a time so the full body is never held in memory
+            head = orjson.dumps(
+                {"message": f"Retrieved {len(trades)} trades", "count": len(trades)}
+            )
+            yield head[:-1] + b',"trades":['
+            for start in range(0, len(trades), STREAM_CHUNK_SIZE):
+                chunk = trades[start : start + STREAM_CHUNK_SIZE]
+                prefix = b"," if start else b""
+                yield prefix + b",".join(orjson.dumps(trade) for trade in chunk)
+            yield b"]}"
+
+        return app.response_class(generate(), status=200, mimetype="application/json")
 
     except Exception as e:
-        return jsonify({"error": "Internal server error", "message": str(e)}), 500
+        return json_response({"error": "Internal server error", "message": str(e)}, 500)
 
 
 @app.route("/api/trades/<trade_id>", methods=["PUT"])
@@ -191,116 +649,84 @@ def update_trade(trade_id):
         # Check if trade exists
         existing_trade = TradeManager.get_trade(trade_id)
         if not existing_trade:
-            return (
-                jsonify(
-                    {
-                        "error": "Trade not found",
-                        "message": f"No trade found with ID: {trade_id}",
-                    }
-                ),
+            return json_response(
+                {
+                    "error": "Trade not found",
+                    "message": f"No trade found with ID: {trade_id}",
+                },
                 404,
             )
 
         trade_data = request.get_json()
         if not trade_data:
-            return (
-                jsonify(
-                    {
-                        "error": "No JSON data provided",
-                        "message": "Request body must contain valid JSON",
-                    }
-                ),
-                400,
-            )
+            return json_response(_ERR_NO_JSON, 400)
 
         # Preserve the original trade_id and add update timestamp
         trade_data["trade_id"] = trade_id
-        trade_data["updated_timestamp"] = datetime.now().isoformat()
+        trade_data["updated_timestamp"] = now_iso()
 
         TradeManager.save_trade(trade_data)
 
-        return (
-            jsonify(
-                {
-                    "message": "Trade updated successfully",
-                    "trade_id": trade_id,
-                    "trade_data": trade_data,
-                }
-            ),
+        return json_response(
+            {
+                "message": "Trade updated successfully",
+                "trade_id": trade_id,
+                "trade_data": trade_data,
+            },
             200,
         )
 
     except json.JSONDecodeError:
-        return (
-            jsonify(
-                {
-                    "error": "Invalid JSON format",
-                    "message": "Request body must contain valid JSON",
-                }
-            ),
-            400,
-        )
+        return json_response(_ERR_INVALID_JSON, 400)
     except Exception as e:
-        return jsonify({"error": "Internal server error", "message": str(e)}), 500
+        return json_response({"error": "Internal server error", "message": str(e)}, 500)
 
 
 @app.route("/api/trades/<trade_id>", methods=["DELETE"])
 def delete_trade(trade_id):
     """Delete a trade"""
     try:
-        file_path = os.path.join(TRADES_DIR, f"{trade_id}.json")
-
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            return (
-                jsonify(
-                    {"message": "Trade deleted successfully", "trade_id": trade_id}
-                ),
-                200,
+        if TradeManager.delete_trade(trade_id):
+            return json_response(
+                {"message": "Trade deleted successfully", "trade_id": trade_id}, 200
             )
         else:
-            return (
-                jsonify(
-                    {
-                        "error": "Trade not found",
-                        "message": f"No trade found with ID: {trade_id}",
-                    }
-                ),
+            return json_response(
+                {
+                    "error": "Trade not found",
+                    "message": f"No trade found with ID: {trade_id}",
+                },
                 404,
             )
 
     except Exception as e:
-        return jsonify({"error": "Internal server error", "message": str(e)}), 500
+        return json_response({"error": "Internal server error", "message": str(e)}, 500)
 
 
 @app.errorhandler(404)
 def not_found(error):
-    return (
-        jsonify(
-            {
-                "error": "Endpoint not found",
-                "message": "The requested endpoint does not exist",
-            }
-        ),
-        404,
-    )
+    return _NOT_FOUND_RESPONSE
 
 
 @app.errorhandler(405)
 def method_not_allowed(error):
-    return (
-        jsonify(
-            {
-                "error": "Method not allowed",
-                "message": "The request method is not allowed for this endpoint",
-            }
-        ),
-        405,
-    )
+    return _METHOD_NOT_ALLOWED_RESPONSE
 
 
 if __name__ == "__main__":
     # Get port from environment variable or default to 5000
     port = int(os.environ.get("PORT", 5000))
     debug = os.environ.get("FLASK_ENV", "development") == "development"
-    app.run(debug=debug, host="0.0.0.0", port=port)
+    if debug:
+        app.run(debug=debug, host="0.0.0.0", port=port)
+    else:
+        # Outside development, serve with gunicorn (settings in gunicorn.conf.py)
+        try:
+            os.execvp("gunicorn", ["gunicorn", "--bind", f"0.0.0.0:{port}", "app:app"])
+        except FileNotFoundError:
+            print(
+                "gunicorn is not installed; falling back to the Flask server. "
+                "Install it with 'pip install gunicorn' for production use.",
+                file=sys.stderr,
+            )
+            app.run(host="0.0.0.0", port=port)
@@ -0,0 +1,35 @@
+"""
+Gunicorn configuration for the Transaction Management API
+Loaded automatically when gunicorn is started from the project directory
+"""
+
+import os
+
+# Bind to the platform-provided port (Railway, Heroku) or 8000 locally
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# Cap on the default worker count; every worker holds its own copy of all
+# trades and replays the whole trade log when it starts
+MAX_DEFAULT_WORKERS = 4
+
+
+def default_workers():
+    """CPUs this process may run on (not the host total), capped"""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    return min(cpus, MAX_DEFAULT_WORKERS)
+
+
+# One process per usable CPU, each serving requests from a pool of threads
+workers = int(os.environ.get("WEB_CONCURRENCY", default_workers()))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+
+# Keep client connections open between requests
+keepalive = 75
+
+timeout = 120
+accesslog = "-"
+errorlog = "-"
@@ -9,12 +9,16 @@ import time
 import logging
 from typing import Optional, Dict, Any
 import requests
+from requests.adapters import HTTPAdapter
 from pyngrok import ngrok, conf
 
 
 class NgrokManager:
     """Manages ngrok tunnels for the Transaction Management API"""
     
+    # Seconds a get_all_tunnels() result is reused before asking the agent again
+    TUNNELS_CACHE_TTL = 0.5
+    
     def __init__(self, authtoken: Optional[str] = None, region: str = "us"):
         """
         Initialize NgrokManager
@@ -27,6 +31,13 @@ class NgrokManager:
         self.region = region
         self.tunnel = None
         self.tunnel_url = None
+        # (fetched at, tunnel list) from the last get_all_tunnels() call
+        self._tunnels_cache = (0.0, None)
+        
+        # Reuse connections to the tunnel across probes instead of paying a
+        # TLS handshake for every request
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
         
         # Configure logging
         self.logger = logging.getLogger(__name__)
@@ -58,6 +69,7 @@ class NgrokManager:
         try:
             # Stop existing tunnel if any
             self.stop_tunnel()
+            self._tunnels_cache = (0.0, None)
             
             # Configure tunnel options
             tunnel_options = {
@@ -97,6 +109,9 @@ class NgrokManager:
             finally:
                 self.tunnel = None
                 self.tunnel_url = None
+                self._tunnels_cache = (0.0, None)
+                # Drop pooled connections to the old tunnel
+                self._session.close()
     
     def get_tunnel_info(self) -> Optional[Dict[str, Any]]:
         """
@@ -120,12 +135,20 @@ class NgrokManager:
         """
         Get information about all active tunnels
         
+        Results are cached for TUNNELS_CACHE_TTL seconds, since each fetch
+        is an HTTP call to the local ngrok agent.
+        
         Returns:
             List of tunnel information
         """
+        now = time.monotonic()
+        fetched_at, cached = self._tunnels_cache
+        if cached is not None and now - fetched_at < self.TUNNELS_CACHE_TTL:
+            return list(cached)
+        
         try:
             tunnels = ngrok.get_tunnels()
-            return [
+            result = [
                 {
                     "public_url": tunnel.public_url,
                     "local_url": f"http://localhost:{tunnel.local_port}",
@@ -134,6 +157,8 @@ class NgrokManager:
                 }
                 for tunnel in tunnels
             ]
+            self._tunnels_cache = (now, result)
+            return list(result)
         except Exception as e:
             self.logger.error(f"Failed to get tunnels: {e}")
             return []
@@ -153,16 +178,30 @@ class NgrokManager:
             
         try:
             url = f"{self.tunnel_url}{endpoint}"
-            response = requests.get(url, timeout=10)
+            response = self._session.get(url, timeout=10)
             return response.status_code == 200
         except Exception as e:
             self.logger.error(f"Tunnel test failed: {e}")
             return False
     
+    def _probe(self, endpoint: str = "/health", timeout: float = 0.5) -> bool:
+        """Single quick readiness check; failures are expected while waiting"""
+        try:
+            response = self._session.get(
+                f"{self.tunnel_url}{endpoint}", timeout=timeout
+            )
+            return response.status_code == 200
+        except requests.RequestException as e:
+            self.logger.debug(f"Tunnel not ready yet: {e}")
+            return False
+    
     def wait_for_tunnel(self, max_wait: int = 30) -> bool:
         """
         Wait for tunnel to be ready
         
+        Probes with exponential backoff (50ms doubling up to 1s) so a tunnel
+        that comes up quickly is detected quickly.
+        
         Args:
             max_wait: Maximum time to wait in seconds
             
@@ -172,11 +211,13 @@ class NgrokManager:
         if not self.tunnel_url:
             return False
             
-        start_time = time.time()
-        while time.time() - start_time < max_wait:
-            if self.test_tunnel():
+        deadline = time.monotonic() + max_wait
+        delay = 0.05
+        while time.monotonic() < deadline:
+            if self._probe(timeout=0.5):
                 return True
-            time.sleep(1)
+            time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+            delay = min(delay * 2, 1.0)
         
         return False
     
@@ -204,10 +245,19 @@ class NgrokManager:
         """Context manager entry"""
         return self
     
+    def close(self):
+        """Stop the tunnel and shut down the ngrok agent"""
+        # Killing the agent tears down all of its tunnels, so skip the
+        # disconnect round trip that stop_tunnel() would make
+        self.tunnel = None
+        self.tunnel_url = None
+        self._tunnels_cache = (0.0, None)
+        self._session.close()
+        ngrok.kill()
+    
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit - cleanup tunnel"""
-        self.stop_tunnel()
-        ngrok.kill()
+        self.close()
 
 
 # Convenience functions
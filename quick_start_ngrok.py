@@ -3,12 +3,24 @@ Quick start script for ngrok integration
 Run this to quickly set up and test ngrok with the Transaction Management API
 """
 
+import hashlib
 import os
 import sys
 import subprocess
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+
+# Records which requirements.txt (and interpreter) the last install satisfied
+DEPS_STAMP = Path(".quick_start_deps")
+
+# Shared HTTP session so repeated health/API checks reuse pooled connections
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
 
 
 def print_status(message):
@@ -23,6 +35,23 @@ def print_error(message):
     print(f"[ERROR] {message}")
 
 
+def wait_for_url(url, timeout=5.0, interval=0.025, ready=None):
+    """Poll url until it returns 200 (and ready(response), if given)
+
+    Returns the successful response, or None if the deadline passes first.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = SESSION.get(url, timeout=0.25)
+            if response.status_code == 200 and (ready is None or ready(response)):
+                return response
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(interval)
+    return None
+
+
 def check_requirements():
     """Check if all requirements are met"""
     print_status("Checking requirements...")
@@ -49,46 +78,52 @@ def check_requirements():
 
 
 def install_dependencies():
-    """Install Python dependencies"""
+    """Install Python dependencies, skipping pip if nothing has changed"""
+    digest = hashlib.blake2b(Path("requirements.txt").read_bytes())
+    digest.update(sys.executable.encode())
+    stamp = digest.hexdigest()
+    if DEPS_STAMP.exists() and DEPS_STAMP.read_text().strip() == stamp:
+        print_status("Python dependencies are up to date")
+        return True
+    
     print_status("Installing Python dependencies...")
     try:
         subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
-        return True
     except subprocess.CalledProcessError as e:
         print_error(f"Failed to install dependencies: {e}")
         return False
+    
+    DEPS_STAMP.write_text(stamp)
+    return True
 
 
 def start_flask_app():
     """Start the Flask application"""
     print_status("Starting Flask application...")
     
+    # Production mode skips the reloader and debugger; app.py then serves with
+    # gunicorn, or the plain Flask server where gunicorn is unavailable
     env = os.environ.copy()
-    env["FLASK_ENV"] = "development"
+    env["FLASK_ENV"] = "production"
+    env["FLASK_DEBUG"] = "0"
     env["FLASK_APP"] = "app.py"
+    env["PORT"] = "5000"
     
     try:
-        # Start Flask in background
+        # Start Flask in background. Nothing reads its output, so a pipe would
+        # eventually fill up and block the server; discard the access log and
+        # leave errors on the console
         process = subprocess.Popen(
             [sys.executable, "app.py"],
             env=env,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
+            stdout=subprocess.DEVNULL
         )
         
-        # Wait for Flask to start
-        time.sleep(3)
-        
-        # Check if Flask is running
-        try:
-            response = requests.get("http://localhost:5000/health", timeout=5)
-            if response.status_code == 200:
-                print_status("Flask app is running successfully")
-                return process
-            else:
-                print_error(f"Flask health check failed with status {response.status_code}")
-                return None
-        except requests.exceptions.RequestException:
+        # Wait until Flask answers its health check
+        if wait_for_url("http://localhost:5000/health", timeout=5):
+            print_status("Flask app is running successfully")
+            return process
+        else:
             print_error("Flask app is not responding")
             return None
             
@@ -101,57 +136,30 @@ def start_ngrok_tunnel():
     """Start ngrok tunnel"""
     print_status("Starting ngrok tunnel...")
     
-    try:
-        # Check if ngrok is installed
-        subprocess.check_call(["ngrok", "version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print_error("ngrok not found. Please install ngrok from https://ngrok.com/download")
-        return None
+    # Imported here because pyngrok is only available after install_dependencies()
+    from ngrok_manager import NgrokManager
     
+    manager = NgrokManager()
     try:
-        # Configure auth token
-        authtoken = os.environ.get("NGROK_AUTHTOKEN")
-        subprocess.check_call(["ngrok", "config", "add-authtoken", authtoken])
-        
-        # Start tunnel
-        process = subprocess.Popen(
-            ["ngrok", "http", "5000", "--log=stdout"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        
-        # Wait for tunnel to start
-        time.sleep(5)
-        
-        # Get tunnel URL
-        try:
-            response = requests.get("http://localhost:4040/api/tunnels", timeout=5)
-            if response.status_code == 200:
-                tunnels = response.json().get("tunnels", [])
-                for tunnel in tunnels:
-                    if tunnel.get("proto") == "https":
-                        tunnel_url = tunnel["public_url"]
-                        print_status(f"🎉 ngrok tunnel is active!")
-                        print_status(f"Public URL: {tunnel_url}")
-                        print_status(f"Local URL: http://localhost:5000")
-                        print_status(f"ngrok Web Interface: http://localhost:4040")
-                        print("")
-                        print_status("Test your API:")
-                        print_status(f"curl {tunnel_url}/health")
-                        print_status(f"curl {tunnel_url}/api/trades")
-                        print("")
-                        return process, tunnel_url
-                        
-            print_warning("Could not retrieve tunnel URL")
-            return process, None
-            
-        except requests.exceptions.RequestException:
-            print_warning("Could not connect to ngrok API")
-            return process, None
-            
+        # pyngrok starts the agent and returns once the tunnel is registered
+        tunnel_url = manager.start_tunnel(port=5000)
     except Exception as e:
         print_error(f"Failed to start ngrok: {e}")
         return None
+    
+    if not manager.wait_for_tunnel(max_wait=5):
+        print_warning("Tunnel is not answering yet")
+    
+    print_status(f"🎉 ngrok tunnel is active!")
+    print_status(f"Public URL: {tunnel_url}")
+    print_status(f"Local URL: http://localhost:5000")
+    print_status(f"ngrok Web Interface: http://localhost:4040")
+    print("")
+    print_status("Test your API:")
+    print_status(f"curl {tunnel_url}/health")
+    print_status(f"curl {tunnel_url}/api/trades")
+    print("")
+    return manager, tunnel_url
 
 
 def test_tunnel(tunnel_url):
@@ -162,22 +170,25 @@ def test_tunnel(tunnel_url):
     print_status("Testing tunnel...")
     
     try:
-        # Test health endpoint
-        response = requests.get(f"{tunnel_url}/health", timeout=10)
-        if response.status_code == 200:
+        # The two checks are independent, so run them concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            health = executor.submit(SESSION.get, f"{tunnel_url}/health", timeout=10)
+            api = executor.submit(SESSION.get, f"{tunnel_url}/api/trades", timeout=10)
+            health_response = health.result()
+            api_response = api.result()
+        
+        if health_response.status_code == 200:
             print_status("✅ Tunnel health check passed")
-            
-            # Test API endpoint
-            response = requests.get(f"{tunnel_url}/api/trades", timeout=10)
-            if response.status_code == 200:
-                print_status("✅ Tunnel API check passed")
-                return True
-            else:
-                print_warning("API endpoint test failed")
-                return False
         else:
             print_warning("Health check failed")
             return False
+        
+        if api_response.status_code == 200:
+            print_status("✅ Tunnel API check passed")
+            return True
+        else:
+            print_warning("API endpoint test failed")
+            return False
             
     except requests.exceptions.RequestException as e:
         print_error(f"Tunnel test failed: {e}")
@@ -212,7 +223,7 @@ def main():
         flask_process.terminate()
         return 1
     
-    ngrok_process, tunnel_url = ngrok_result
+    ngrok_manager, tunnel_url = ngrok_result
     
     # Test tunnel
     if tunnel_url and test_tunnel(tunnel_url):
@@ -222,30 +233,22 @@ def main():
         print_status("Press Ctrl+C to stop both services")
         
         try:
-            # Keep running until interrupted
-            while True:
-                time.sleep(1)
-                # Check if processes are still running
-                if flask_process.poll() is not None:
-                    print_error("Flask process has stopped")
-                    break
-                if ngrok_process.poll() is not None:
-                    print_error("ngrok process has stopped")
-                    break
-                    
+            # Block until Flask exits instead of polling it. Ctrl+C reaches the
+            # Flask child as well, so this also returns when the user stops
+            flask_process.wait()
+            print_error("Flask process has stopped")
         except KeyboardInterrupt:
             print_status("\nStopping services...")
         
         # Cleanup
         flask_process.terminate()
-        ngrok_process.terminate()
+        ngrok_manager.close()
         print_status("Services stopped")
         return 0
     else:
         print_error("Setup failed")
         flask_process.terminate()
-        if ngrok_process:
-            ngrok_process.terminate()
+        ngrok_manager.close()
         return 1
 
 
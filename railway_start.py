@@ -23,15 +23,13 @@ def main():
         print(f"Error: {e}")
         sys.exit(1)
     
-    # Build gunicorn command
+    # Build gunicorn command. Workers, gthread threads and keep-alive come
+    # from gunicorn.conf.py (WEB_CONCURRENCY / GUNICORN_THREADS override them)
     cmd = [
         'gunicorn',
         '--bind', f'0.0.0.0:{port}',
         'app:app',
-        '--workers', '1',
         '--timeout', '120',
-        '--keep-alive', '2',
-        '--max-requests', '1000',
         '--access-logfile', '-',
         '--error-logfile', '-',
         '--log-level', 'info'
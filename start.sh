@@ -8,11 +8,8 @@ PORT=${PORT:-8000}
 
 echo "Starting Transaction Management API on port $PORT"
 
-# Start gunicorn with the correct port
+# Start gunicorn with the correct port (workers and threads come from gunicorn.conf.py)
 exec gunicorn --bind 0.0.0.0:$PORT app:app \
-    --workers 1 \
     --timeout 120 \
-    --keep-alive 2 \
-    --max-requests 1000 \
     --access-logfile - \
     --error-logfile -
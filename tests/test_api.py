@@ -4,29 +4,50 @@ Unit tests for Transaction Management API
 
 import pytest
 import json
-import tempfile
 import os
-from unittest.mock import patch, mock_open
+import uuid
+from unittest.mock import patch
+import app as app_module
 from app import app, TradeManager
 
-@pytest.fixture
+# Sample trade data for testing; copy before mutating
+SAMPLE_TRADE = {
+    "symbol": "AAPL",
+    "quantity": 100,
+    "price": 150.25,
+    "side": "BUY",
+    "trader_id": "test_trader",
+    "account": "TEST_ACC"
+}
+
+@pytest.fixture(scope="module")
 def client():
-    """Create a test client"""
+    """Create a test client shared by the module's tests"""
     app.config['TESTING'] = True
     with app.test_client() as client:
         yield client
 
-@pytest.fixture
-def sample_trade():
-    """Sample trade data for testing"""
-    return {
-        "symbol": "AAPL",
-        "quantity": 100,
-        "price": 150.25,
-        "side": "BUY",
-        "trader_id": "test_trader",
-        "account": "TEST_ACC"
-    }
+@pytest.fixture(autouse=True)
+def trade_store(tmp_path, monkeypatch):
+    """Point the trade log at a temporary directory"""
+    monkeypatch.setattr('app.TRADES_DIR', str(tmp_path))
+    monkeypatch.setattr('app._TRADES', {})
+    monkeypatch.setattr('app._INDEX', {})
+    monkeypatch.setattr('app._LOG_FD', None)
+    monkeypatch.setattr('app._LOG_POS', 0)
+    monkeypatch.setattr('app._WRITES_APPENDED', 0)
+    monkeypatch.setattr('app._WRITES_SYNCED', 0)
+    monkeypatch.setattr('app._SYNC_ERROR', None)
+    monkeypatch.setattr('app.SYNC_RETRY_DELAY', 0.01)
+    yield tmp_path
+    # Let the sync thread finish with the log before it is closed
+    TradeManager.flush(timeout=5)
+    if app_module._LOG_FD is not None:
+        os.close(app_module._LOG_FD)
+
+def stub(monkeypatch, name, func):
+    """Replace a TradeManager static method for the duration of a test"""
+    monkeypatch.setattr(TradeManager, name, staticmethod(func))
 
 class TestHealthCheck:
     """Test health check endpoint"""
@@ -36,7 +57,7 @@ class TestHealthCheck:
         response = client.get('/health')
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['status'] == 'healthy'
         assert 'timestamp' in data
         assert data['message'] == 'Transaction Management API is running'
@@ -44,32 +65,37 @@ class TestHealthCheck:
 class TestTradeCreation:
     """Test trade creation endpoints"""
     
-    def test_create_trade_success(self, client, sample_trade):
+    def test_create_trade_success(self, client, monkeypatch):
         """Test successful trade creation"""
-        with patch('app.TradeManager.save_trade') as mock_save:
-            mock_save.return_value = 'test-trade-id'
-            
-            response = client.post('/api/trades', 
-                                 data=json.dumps(sample_trade),
-                                 content_type='application/json')
-            
-            assert response.status_code == 201
-            data = json.loads(response.data)
-            assert data['message'] == 'Trade created successfully'
-            assert data['trade_id'] == 'test-trade-id'
+        stub(monkeypatch, 'save_trade', lambda trade_data: 'test-trade-id')
+        
+        response = client.post('/api/trades', json=SAMPLE_TRADE)
+        
+        assert response.status_code == 201
+        data = response.get_json()
+        assert data['message'] == 'Trade created successfully'
+        assert data['trade_id'] == 'test-trade-id'
     
     def test_create_trade_missing_fields(self, client):
         """Test trade creation with missing required fields"""
         incomplete_trade = {"symbol": "AAPL"}
         
-        response = client.post('/api/trades',
-                             data=json.dumps(incomplete_trade),
-                             content_type='application/json')
+        response = client.post('/api/trades', json=incomplete_trade)
         
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['error'] == 'Missing required fields'
-        assert 'missing_fields' in data
+        assert data['missing_fields'] == ['quantity', 'price', 'side']
+    
+    def test_create_trade_invalid_side(self, client):
+        """Test trade creation with a side other than BUY or SELL"""
+        trade = dict(SAMPLE_TRADE, side='HOLD')
+        
+        response = client.post('/api/trades', json=trade)
+        
+        assert response.status_code == 400
+        data = response.get_json()
+        assert data['error'] == 'Invalid side'
     
     def test_create_trade_invalid_json(self, client):
         """Test trade creation with invalid JSON"""
@@ -78,13 +104,76 @@ class TestTradeCreation:
                              content_type='application/json')
         
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['error'] == 'Invalid JSON format'
 
+class TestBatchTradeCreation:
+    """Test batch trade creation endpoint"""
+    
+    def test_create_trades_batch_success(self, client, monkeypatch):
+        """Test creating several trades in one request"""
+        trade_ids = iter(['id-1', 'id-2'])
+        stub(monkeypatch, 'save_trade', lambda trade_data: next(trade_ids))
+        
+        response = client.post('/api/trades/batch', json=[SAMPLE_TRADE, SAMPLE_TRADE])
+        
+        assert response.status_code == 201
+        data = response.get_json()
+        assert data['count'] == 2
+        assert data['trade_ids'] == ['id-1', 'id-2']
+    
+    def test_create_trades_batch_missing_fields(self, client, monkeypatch):
+        """Test a batch is rejected before saving if any trade is incomplete"""
+        saved = []
+        stub(monkeypatch, 'save_trade', saved.append)
+        
+        response = client.post('/api/trades/batch', json=[SAMPLE_TRADE, {"symbol": "AAPL"}])
+        
+        assert response.status_code == 400
+        data = response.get_json()
+        assert data['error'] == 'Missing required fields'
+        assert data['index'] == 1
+        assert saved == []
+    
+    def test_create_trades_batch_requires_array(self, client):
+        """Test batch creation rejects a non-array body"""
+        response = client.post('/api/trades/batch', json=SAMPLE_TRADE)
+        
+        assert response.status_code == 400
+        data = response.get_json()
+        assert data['error'] == 'No trades provided'
+
+class TestBatchTradeDeletion:
+    """Test batch trade deletion endpoint"""
+    
+    def test_delete_trades_batch(self, client):
+        """Test deleting several trades in one request"""
+        kept = TradeManager.save_trade({"symbol": "AAPL"})
+        doomed = [TradeManager.save_trade({"symbol": "MSFT"}) for _ in range(2)]
+        
+        response = client.post('/api/trades/batch/delete',
+                               json={"trade_ids": doomed + ["missing"]})
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['count'] == 2
+        assert data['deleted'] == doomed
+        assert data['not_found'] == ['missing']
+        assert [t['trade_id'] for t in TradeManager.get_all_trades()] == [kept]
+    
+    def test_delete_trades_batch_requires_ids(self, client):
+        """Test batch deletion rejects a body without a list of IDs"""
+        for body in ({}, {"trade_ids": []}, {"trade_ids": [1]}, ["id"]):
+            response = client.post('/api/trades/batch/delete', json=body)
+            
+            assert response.status_code == 400
+            data = response.get_json()
+            assert data['error'] == 'No trade IDs provided'
+
 class TestTradeRetrieval:
     """Test trade retrieval endpoints"""
     
-    def test_get_trade_success(self, client):
+    def test_get_trade_success(self, client, monkeypatch):
         """Test successful trade retrieval"""
         test_trade = {
             "trade_id": "test-id",
@@ -94,145 +183,334 @@ class TestTradeRetrieval:
             "side": "BUY"
         }
         
-        with patch('app.TradeManager.get_trade') as mock_get:
-            mock_get.return_value = test_trade
-            
-            response = client.get('/api/trades/test-id')
-            
-            assert response.status_code == 200
-            data = json.loads(response.data)
-            assert data['message'] == 'Trade found'
-            assert data['trade_data'] == test_trade
+        stub(monkeypatch, 'get_trade_with_etag', lambda trade_id: (test_trade, "etag"))
+        
+        response = client.get('/api/trades/test-id')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['message'] == 'Trade found'
+        assert data['trade_data'] == test_trade
+    
+    def test_get_trade_etag(self, client):
+        """Test trade retrieval honours If-None-Match"""
+        trade_id = TradeManager.save_trade({"symbol": "AAPL"})
+        
+        response = client.get(f'/api/trades/{trade_id}')
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        
+        response = client.get(f'/api/trades/{trade_id}',
+                            headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+        
+        TradeManager.save_trade({"trade_id": trade_id, "symbol": "MSFT"})
+        response = client.get(f'/api/trades/{trade_id}',
+                            headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
     
     def test_get_trade_not_found(self, client):
         """Test trade retrieval when trade doesn't exist"""
-        with patch('app.TradeManager.get_trade') as mock_get:
-            mock_get.return_value = None
-            
-            response = client.get('/api/trades/nonexistent-id')
-            
-            assert response.status_code == 404
-            data = json.loads(response.data)
-            assert data['error'] == 'Trade not found'
+        response = client.get('/api/trades/nonexistent-id')
+        
+        assert response.status_code == 404
+        data = response.get_json()
+        assert data['error'] == 'Trade not found'
     
-    def test_get_all_trades(self, client):
+    def test_get_all_trades(self, client, monkeypatch):
         """Test retrieving all trades"""
         test_trades = [
             {"trade_id": "1", "symbol": "AAPL"},
             {"trade_id": "2", "symbol": "GOOGL"}
         ]
+        stub(monkeypatch, 'get_all_trades', lambda: test_trades)
         
-        with patch('app.TradeManager.get_all_trades') as mock_get_all:
-            mock_get_all.return_value = test_trades
-            
-            response = client.get('/api/trades')
-            
-            assert response.status_code == 200
-            data = json.loads(response.data)
-            assert data['count'] == 2
-            assert data['trades'] == test_trades
+        response = client.get('/api/trades')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['count'] == 2
+        assert data['trades'] == test_trades
+    
+    def test_get_all_trades_streams_in_chunks(self, client, monkeypatch):
+        """Test the streamed listing is valid JSON across chunk boundaries"""
+        monkeypatch.setattr('app.STREAM_CHUNK_SIZE', 2)
+        test_trades = [{"trade_id": str(i)} for i in range(5)]
+        stub(monkeypatch, 'get_all_trades', lambda: test_trades)
+        
+        response = client.get('/api/trades')
+        
+        assert response.is_streamed
+        data = response.get_json()
+        assert data['message'] == 'Retrieved 5 trades'
+        assert data['trades'] == test_trades
+    
+    def test_get_all_trades_empty(self, client):
+        """Test retrieving all trades when none exist"""
+        response = client.get('/api/trades')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['count'] == 0
+        assert data['trades'] == []
 
 class TestTradeManager:
     """Test TradeManager class methods"""
     
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('os.path.join')
-    @patch('json.dump')
-    def test_save_trade(self, mock_json_dump, mock_path_join, mock_file):
+    def test_save_trade(self, trade_store):
         """Test trade saving functionality"""
-        mock_path_join.return_value = '/fake/path/trade.json'
-        
         trade_data = {"symbol": "AAPL", "quantity": 100}
         trade_id = TradeManager.save_trade(trade_data)
         
         assert trade_id is not None
         assert 'trade_id' in trade_data
         assert 'timestamp' in trade_data
-        mock_file.assert_called_once()
-        mock_json_dump.assert_called_once()
+        TradeManager.flush()
+        lines = (trade_store / 'trades.jsonl').read_bytes().splitlines()
+        assert [json.loads(line) for line in lines] == [trade_data]
     
-    @patch('builtins.open', new_callable=mock_open, read_data='{"trade_id": "test"}')
-    @patch('os.path.exists')
-    @patch('json.load')
-    def test_get_trade(self, mock_json_load, mock_exists, mock_file):
+    def test_flush_group_commits_appended_trades(self):
+        """Test saves return before syncing and flush waits for the sync"""
+        with patch('app._fdatasync') as mock_fdatasync:
+            for quantity in range(10):
+                TradeManager.save_trade({"symbol": "AAPL", "quantity": quantity})
+            TradeManager.flush(timeout=5)
+
+        assert 1 <= mock_fdatasync.call_count < 10
+        assert app_module._WRITES_SYNCED == 10
+
+    def test_sync_failure_is_surfaced(self):
+        """Test a failing sync rejects new writes until a sync succeeds"""
+        with patch('app._fdatasync', side_effect=OSError("disk full")):
+            TradeManager.save_trade({"trade_id": "first", "symbol": "AAPL"})
+            with pytest.raises(OSError, match="disk full"):
+                TradeManager.flush(timeout=5)
+            with pytest.raises(OSError, match="disk full"):
+                TradeManager.save_trade({"trade_id": "second", "symbol": "AAPL"})
+
+        # The sync thread keeps retrying and recovers once syncing works again
+        with app_module._WRITES_DONE:
+            assert app_module._WRITES_DONE.wait_for(
+                lambda: app_module._SYNC_ERROR is None, timeout=5
+            )
+        TradeManager.flush(timeout=5)
+        assert TradeManager.get_trade("second") is None
+        TradeManager.save_trade({"trade_id": "second", "symbol": "AAPL"})
+
+    def test_now_iso_is_cached_per_second(self):
+        """Test timestamps are reused within a second and refreshed after"""
+        with patch('time.time', return_value=1700000000.25):
+            first = app_module.now_iso()
+        with patch('time.time', return_value=1700000000.75), \
+             patch('app.datetime') as mock_datetime:
+            assert app_module.now_iso() == first
+            mock_datetime.fromtimestamp.assert_not_called()
+        with patch('time.time', return_value=1700000001.0):
+            assert app_module.now_iso() != first
+
+    def test_new_trade_ids(self):
+        """Test batch-generated trade IDs are unique UUID4 hex strings"""
+        trade_ids = app_module.new_trade_ids(3)
+
+        assert len(set(trade_ids)) == 3
+        for trade_id in trade_ids:
+            assert uuid.UUID(hex=trade_id).version == 4
+            assert uuid.UUID(hex=trade_id).hex == trade_id
+    
+    def test_get_trade(self):
         """Test trade retrieval functionality"""
-        mock_exists.return_value = True
-        mock_json_load.return_value = {"trade_id": "test"}
+        trade_data = {"trade_id": "test", "symbol": "AAPL"}
+        TradeManager.save_trade(trade_data)
         
         result = TradeManager.get_trade("test")
         
-        assert result == {"trade_id": "test"}
-        mock_file.assert_called_once()
-        mock_json_load.assert_called_once()
+        assert result == trade_data
+        assert result is not trade_data
     
-    @patch('os.path.exists')
-    def test_get_trade_not_exists(self, mock_exists):
-        """Test trade retrieval when file doesn't exist"""
-        mock_exists.return_value = False
-        
+    def test_get_trade_with_etag(self):
+        """Test the ETag returned with a trade matches that version of it"""
+        TradeManager.save_trade({"trade_id": "test", "quantity": 100})
+        first, first_etag = TradeManager.get_trade_with_etag("test")
+        TradeManager.save_trade({"trade_id": "test", "quantity": 200})
+        second, second_etag = TradeManager.get_trade_with_etag("test")
+
+        assert (first["quantity"], second["quantity"]) == (100, 200)
+        assert first_etag != second_etag
+        assert TradeManager.get_trade_with_etag("test") == (second, second_etag)
+        assert TradeManager.get_trade_with_etag("nonexistent") == (None, None)
+
+    def test_get_trade_not_exists(self):
+        """Test trade retrieval when trade doesn't exist"""
         result = TradeManager.get_trade("nonexistent")
-        
+
         assert result is None
 
+    def test_get_all_trades_uses_index(self):
+        """Test all-trades lookup is served from the in-memory index"""
+        trade_id = TradeManager.save_trade({"symbol": "AAPL"})
+        assert [t['trade_id'] for t in TradeManager.get_all_trades()] == [trade_id]
+
+        with patch('os.scandir') as mock_scandir:
+            assert len(TradeManager.get_all_trades()) == 1
+            mock_scandir.assert_not_called()
+
+        assert TradeManager.delete_trade(trade_id) is True
+        assert TradeManager.delete_trade(trade_id) is False
+        assert TradeManager.get_all_trades() == []
+
+    def test_update_supersedes_previous_record(self):
+        """Test re-saving a trade returns only the latest version"""
+        TradeManager.save_trade({"trade_id": "test", "quantity": 100})
+        TradeManager.save_trade({"trade_id": "test", "quantity": 200})
+
+        assert TradeManager.get_trade("test")["quantity"] == 200
+        assert len(TradeManager.get_all_trades()) == 1
+
+    def test_replays_records_appended_by_other_processes(self, trade_store):
+        """Test records written to the log by another worker become visible"""
+        TradeManager.save_trade({"trade_id": "mine", "symbol": "AAPL"})
+        with open(trade_store / 'trades.jsonl', 'ab') as f:
+            f.write(b'{"trade_id": "theirs", "symbol": "MSFT"}\n')
+
+        assert TradeManager.get_trade("theirs") == {
+            "trade_id": "theirs", "symbol": "MSFT"
+        }
+
+    def test_recovers_from_partial_trailing_record(self, trade_store):
+        """Test a record torn by a crash is skipped and later appends survive"""
+        (trade_store / 'trades.jsonl').write_bytes(
+            b'{"trade_id": "a", "symbol": "AAPL"}\n{"trade_id":"b","sym'
+        )
+
+        TradeManager.save_trade({"trade_id": "c", "symbol": "MSFT"})
+
+        assert TradeManager.get_trade("a") == {"trade_id": "a", "symbol": "AAPL"}
+        assert TradeManager.get_trade("b") is None
+        assert TradeManager.get_trade("c")["symbol"] == "MSFT"
+        assert len(TradeManager.get_all_trades()) == 2
+
+    def test_short_write_is_rejected(self, trade_store, monkeypatch):
+        """Test a partially written record raises and is not replayed"""
+        TradeManager.save_trade({"trade_id": "a", "symbol": "AAPL"})
+        real_write = os.write
+
+        def short_write(fd, data):
+            monkeypatch.setattr(os, 'write', real_write)
+            return real_write(fd, data[:len(data) // 2])
+
+        monkeypatch.setattr(os, 'write', short_write)
+        with pytest.raises(OSError, match="Short write"):
+            TradeManager.save_trade({"trade_id": "b", "symbol": "MSFT"})
+
+        TradeManager.save_trade({"trade_id": "c", "symbol": "MSFT"})
+        assert TradeManager.get_trade("b") is None
+        assert TradeManager.get_trade("c")["symbol"] == "MSFT"
+
+    def test_imports_legacy_trade_files(self, trade_store):
+        """Test trades stored as one JSON file each are moved into the log"""
+        (trade_store / 'legacy.json').write_text('{"trade_id": "legacy"}')
+        (trade_store / 'archive.json').mkdir()
+
+        with patch('app._fdatasync') as mock_fdatasync:
+            assert TradeManager.get_trade("legacy") == {"trade_id": "legacy"}
+            mock_fdatasync.assert_called()
+        assert not (trade_store / 'legacy.json').exists()
+        assert (trade_store / 'archive.json').is_dir()
+
+    def test_legacy_import_tolerates_concurrent_removal(self, trade_store):
+        """Test a legacy file removed by another worker mid-import is skipped"""
+        (trade_store / 'legacy.json').write_text('{"trade_id": "legacy"}')
+
+        with patch('os.remove', side_effect=FileNotFoundError):
+            assert TradeManager.get_trade("legacy") == {"trade_id": "legacy"}
+
+    def test_compact_log(self, trade_store):
+        """Test compaction drops superseded and deleted records"""
+        TradeManager.save_trade({"trade_id": "keep", "quantity": 1})
+        TradeManager.save_trade({"trade_id": "keep", "quantity": 2})
+        TradeManager.save_trade({"trade_id": "gone", "quantity": 1})
+        TradeManager.delete_trade("gone")
+
+        TradeManager.compact_log()
+
+        TradeManager.flush()
+        lines = (trade_store / 'trades.jsonl').read_bytes().splitlines()
+        assert len(lines) == 1
+        assert TradeManager.get_trade("keep")["quantity"] == 2
+        assert TradeManager.get_trade("gone") is None
+
 class TestTradeUpdate:
     """Test trade update endpoints"""
     
-    def test_update_trade_success(self, client, sample_trade):
+    def test_update_trade_success(self, client, monkeypatch):
         """Test successful trade update"""
-        with patch('app.TradeManager.get_trade') as mock_get, \
-             patch('app.TradeManager.save_trade') as mock_save:
-            
-            mock_get.return_value = sample_trade
-            mock_save.return_value = 'test-id'
-            
-            update_data = {"quantity": 200, "price": 160.00}
-            
-            response = client.put('/api/trades/test-id',
-                                data=json.dumps(update_data),
-                                content_type='application/json')
-            
-            assert response.status_code == 200
-            data = json.loads(response.data)
-            assert data['message'] == 'Trade updated successfully'
+        stub(monkeypatch, 'get_trade', lambda trade_id: dict(SAMPLE_TRADE))
+        stub(monkeypatch, 'save_trade', lambda trade_data: 'test-id')
+        
+        update_data = {"quantity": 200, "price": 160.00}
+        
+        response = client.put('/api/trades/test-id', json=update_data)
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['message'] == 'Trade updated successfully'
     
-    def test_update_nonexistent_trade(self, client):
+    def test_update_nonexistent_trade(self, client, monkeypatch):
         """Test updating a trade that doesn't exist"""
-        with patch('app.TradeManager.get_trade') as mock_get:
-            mock_get.return_value = None
-            
-            update_data = {"quantity": 200}
-            
-            response = client.put('/api/trades/nonexistent-id',
-                                data=json.dumps(update_data),
-                                content_type='application/json')
-            
-            assert response.status_code == 404
-            data = json.loads(response.data)
-            assert data['error'] == 'Trade not found'
+        stub(monkeypatch, 'get_trade', lambda trade_id: None)
+        
+        update_data = {"quantity": 200}
+        
+        response = client.put('/api/trades/nonexistent-id', json=update_data)
+        
+        assert response.status_code == 404
+        data = response.get_json()
+        assert data['error'] == 'Trade not found'
 
 class TestTradeDelete:
     """Test trade deletion endpoints"""
     
-    @patch('os.remove')
-    @patch('os.path.exists')
-    def test_delete_trade_success(self, mock_exists, mock_remove, client):
+    def test_delete_trade_success(self, client, monkeypatch):
         """Test successful trade deletion"""
-        mock_exists.return_value = True
+        deleted = []
+        stub(monkeypatch, 'delete_trade', lambda trade_id: deleted.append(trade_id) or True)
         
         response = client.delete('/api/trades/test-id')
         
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['message'] == 'Trade deleted successfully'
-        mock_remove.assert_called_once()
+        assert deleted == ['test-id']
     
-    @patch('os.path.exists')
-    def test_delete_nonexistent_trade(self, mock_exists, client):
+    def test_delete_nonexistent_trade(self, client, monkeypatch):
         """Test deleting a trade that doesn't exist"""
-        mock_exists.return_value = False
+        stub(monkeypatch, 'delete_trade', lambda trade_id: False)
         
         response = client.delete('/api/trades/nonexistent-id')
         
         assert response.status_code == 404
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['error'] == 'Trade not found'
+
+class TestErrorHandlers:
+    """Test JSON responses for unknown endpoints and methods"""
+    
+    def test_unknown_endpoint(self, client):
+        """Test unknown endpoints return the JSON 404 body on every request"""
+        for _ in range(2):
+            response = client.get('/api/unknown')
+            
+            assert response.status_code == 404
+            data = response.get_json()
+            assert data['error'] == 'Endpoint not found'
+    
+    def test_method_not_allowed(self, client):
+        """Test unsupported methods return the JSON 405 body"""
+        response = client.patch('/api/trades')
+        
+        assert response.status_code == 405
+        data = response.get_json()
+        assert data['error'] == 'Method not allowed'
@@ -3,11 +3,58 @@ Integration tests for the Transaction Management API with ngrok support
 These tests can run against both local and ngrok tunnel URLs
 """
 
+import httpx
+import orjson
 import pytest
 import requests
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
+from requests.adapters import HTTPAdapter
+
+
+# Keep-alive session for the readiness check and tunnel tests, so requests
+# reuse pooled connections instead of opening a new TCP/TLS connection each time
+SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=0)
+SESSION.mount("http://", _ADAPTER)
+SESSION.mount("https://", _ADAPTER)
+
+# Headers sent with every request, set once per client rather than per call
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept-Encoding": "gzip",
+    "User-Agent": "API-Integration-Tests/1.0"
+}
+SESSION.headers.update(DEFAULT_HEADERS)
+
+
+# The trade most tests create, encoded once instead of on every request
+SAMPLE_TRADE = {
+    "symbol": "AAPL",
+    "quantity": 100,
+    "price": 150.00,
+    "side": "BUY"
+}
+SAMPLE_TRADE_BODY = orjson.dumps(SAMPLE_TRADE)
+
+MULTIPLE_TRADES = [
+    {"symbol": "AAPL", "quantity": 10, "price": 150.00, "side": "BUY"},
+    {"symbol": "GOOGL", "quantity": 20, "price": 2800.00, "side": "SELL"},
+    {"symbol": "MSFT", "quantity": 30, "price": 330.00, "side": "BUY"},
+    {"symbol": "TSLA", "quantity": 40, "price": 250.00, "side": "SELL"},
+    {"symbol": "AMZN", "quantity": 50, "price": 135.00, "side": "BUY"},
+]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def close_session():
+    """Close the shared session once the module's tests are done"""
+    try:
+        yield
+    finally:
+        SESSION.close()
 
 
 class TestAPIIntegration:
@@ -32,46 +79,44 @@ class TestAPIIntegration:
     @pytest.fixture(scope="class")
     def api_client(self, base_url: str):
         """Create an API client for testing"""
-        return APIClient(base_url)
+        client = APIClient(base_url)
+        yield client
+        client.close()
+    
+    @pytest.fixture(scope="class")
+    def trade_id(self, api_client) -> str:
+        """Create one trade shared by the get, update and delete tests
+        
+        Those tests run in definition order, so the trade is deleted last.
+        """
+        response = api_client.post("/api/trades", content=SAMPLE_TRADE_BODY)
+        assert response.status_code == 201
+        return orjson.loads(response.content)["trade_id"]
     
     def test_health_endpoint(self, api_client):
         """Test the health endpoint"""
         response = api_client.get("/health")
         assert response.status_code == 200
         
-        data = response.json()
+        data = orjson.loads(response.content)
         assert data["status"] == "healthy"
         assert "timestamp" in data
     
     def test_create_trade(self, api_client):
         """Test creating a new trade"""
-        trade_data = {
-            "symbol": "AAPL",
-            "quantity": 100,
-            "price": 150.00,
-            "side": "BUY"
-        }
-        
-        response = api_client.post("/api/trades", json=trade_data)
+        response = api_client.post("/api/trades", content=SAMPLE_TRADE_BODY)
         assert response.status_code == 201
         
-        data = response.json()
+        data = orjson.loads(response.content)
         assert "trade_id" in data
         assert data["message"] == "Trade created successfully"
-        
-        # Store trade_id for cleanup
-        return data["trade_id"]
     
-    def test_get_trade(self, api_client):
+    def test_get_trade(self, api_client, trade_id):
         """Test retrieving a specific trade"""
-        # Create a trade first
-        trade_id = self.test_create_trade(api_client)
-        
-        # Get the trade
         response = api_client.get(f"/api/trades/{trade_id}")
         assert response.status_code == 200
         
-        data = response.json()
+        data = orjson.loads(response.content)
         assert data["trade_id"] == trade_id
         assert data["symbol"] == "AAPL"
         assert data["quantity"] == 100
@@ -83,17 +128,14 @@ class TestAPIIntegration:
         response = api_client.get("/api/trades")
         assert response.status_code == 200
         
-        data = response.json()
+        data = orjson.loads(response.content)
         assert "trades" in data
         assert "total" in data
         assert isinstance(data["trades"], list)
         assert isinstance(data["total"], int)
     
-    def test_update_trade(self, api_client):
+    def test_update_trade(self, api_client, trade_id):
         """Test updating a trade"""
-        # Create a trade first
-        trade_id = self.test_create_trade(api_client)
-        
         # Update the trade
         update_data = {
             "quantity": 200,
@@ -103,25 +145,22 @@ class TestAPIIntegration:
         response = api_client.put(f"/api/trades/{trade_id}", json=update_data)
         assert response.status_code == 200
         
-        data = response.json()
+        data = orjson.loads(response.content)
         assert data["message"] == "Trade updated successfully"
         
         # Verify the update
         get_response = api_client.get(f"/api/trades/{trade_id}")
-        updated_trade = get_response.json()
+        updated_trade = orjson.loads(get_response.content)
         assert updated_trade["quantity"] == 200
         assert updated_trade["price"] == 155.00
     
-    def test_delete_trade(self, api_client):
+    def test_delete_trade(self, api_client, trade_id):
         """Test deleting a trade"""
-        # Create a trade first
-        trade_id = self.test_create_trade(api_client)
-        
         # Delete the trade
         response = api_client.delete(f"/api/trades/{trade_id}")
         assert response.status_code == 200
         
-        data = response.json()
+        data = orjson.loads(response.content)
         assert data["message"] == "Trade deleted successfully"
         assert data["trade_id"] == trade_id
         
@@ -129,6 +168,36 @@ class TestAPIIntegration:
         get_response = api_client.get(f"/api/trades/{trade_id}")
         assert get_response.status_code == 404
     
+    def test_create_multiple_trades(self, api_client):
+        """Test creating and deleting several trades with the batch endpoints"""
+        # One round trip for the whole set instead of one per trade
+        created_ids = api_client.create_trades_batch(MULTIPLE_TRADES)
+        assert len(set(created_ids)) == len(MULTIPLE_TRADES)
+        
+        deleted_ids = api_client.delete_trades_batch(created_ids)
+        assert deleted_ids == created_ids
+    
+    def test_create_multiple_trades_concurrently(self, api_client):
+        """Test creating and deleting several trades with concurrent single requests"""
+        # The requests are I/O bound, so send them in parallel over the pool
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(
+                lambda trade: api_client.post("/api/trades", json=trade),
+                MULTIPLE_TRADES
+            ))
+        
+        assert [response.status_code for response in responses] == [201] * len(MULTIPLE_TRADES)
+        created_ids = [orjson.loads(response.content)["trade_id"] for response in responses]
+        assert len(set(created_ids)) == len(MULTIPLE_TRADES)
+        
+        # Clean up the same way
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(
+                lambda trade_id: api_client.delete(f"/api/trades/{trade_id}"),
+                created_ids
+            ))
+        assert [response.status_code for response in responses] == [200] * len(created_ids)
+    
     def test_invalid_trade_creation(self, api_client):
         """Test creating a trade with invalid data"""
         invalid_data = {
@@ -141,7 +210,7 @@ class TestAPIIntegration:
         response = api_client.post("/api/trades", json=invalid_data)
         assert response.status_code == 400
         
-        data = response.json()
+        data = orjson.loads(response.content)
         assert "error" in data
     
     def test_nonexistent_trade(self, api_client):
@@ -151,7 +220,7 @@ class TestAPIIntegration:
         response = api_client.get(f"/api/trades/{fake_id}")
         assert response.status_code == 404
         
-        data = response.json()
+        data = orjson.loads(response.content)
         assert "error" in data
     
     def test_webhook_endpoint(self, api_client):
@@ -167,37 +236,51 @@ class TestAPIIntegration:
 
 
 class APIClient:
-    """Simple API client for testing"""
+    """Simple API client for testing
+    
+    Uses one httpx client for all requests, so the connection (HTTP/2 where the
+    server negotiates it, e.g. ngrok's HTTPS endpoint) stays open across tests.
+    """
     
     def __init__(self, base_url: str):
         self.base_url = base_url
-        self.session = requests.Session()
-        
-        # Add default headers
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "User-Agent": "API-Integration-Tests/1.0"
-        })
+        self.client = httpx.Client(
+            http2=True, base_url=base_url, headers=DEFAULT_HEADERS, timeout=10.0
+        )
     
-    def get(self, path: str, **kwargs) -> requests.Response:
+    def get(self, path: str, **kwargs) -> httpx.Response:
         """Make a GET request"""
-        url = f"{self.base_url}{path}"
-        return self.session.get(url, **kwargs)
+        return self.client.request("GET", path, **kwargs)
     
-    def post(self, path: str, **kwargs) -> requests.Response:
+    def post(self, path: str, **kwargs) -> httpx.Response:
         """Make a POST request"""
-        url = f"{self.base_url}{path}"
-        return self.session.post(url, **kwargs)
+        return self.client.request("POST", path, **kwargs)
     
-    def put(self, path: str, **kwargs) -> requests.Response:
+    def put(self, path: str, **kwargs) -> httpx.Response:
         """Make a PUT request"""
-        url = f"{self.base_url}{path}"
-        return self.session.put(url, **kwargs)
+        return self.client.request("PUT", path, **kwargs)
     
-    def delete(self, path: str, **kwargs) -> requests.Response:
+    def delete(self, path: str, **kwargs) -> httpx.Response:
         """Make a DELETE request"""
-        url = f"{self.base_url}{path}"
-        return self.session.delete(url, **kwargs)
+        return self.client.request("DELETE", path, **kwargs)
+    
+    def close(self):
+        """Close the underlying connections"""
+        self.client.close()
+    
+    def create_trades_batch(self, trades: list) -> list:
+        """Create several trades in one request, returning their IDs in order"""
+        response = self.post("/api/trades/batch", content=orjson.dumps(trades))
+        response.raise_for_status()
+        return orjson.loads(response.content)["trade_ids"]
+    
+    def delete_trades_batch(self, trade_ids: list) -> list:
+        """Delete several trades in one request, returning the IDs deleted"""
+        response = self.post(
+            "/api/trades/batch/delete", content=orjson.dumps({"trade_ids": trade_ids})
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)["deleted"]
 
 
 @pytest.fixture(scope="session")
@@ -205,11 +288,14 @@ def wait_for_api():
     """Wait for API to be ready before running tests"""
     base_url = os.environ.get("TUNNEL_URL") or os.environ.get("TEST_API_URL") or "http://localhost:5000"
     max_retries = 30
-    retry_delay = 2
+    retry_delay = 0.05
+    max_retry_delay = 2.0
+    start = time.monotonic()
     
     for i in range(max_retries):
         try:
-            response = requests.get(f"{base_url}/health", timeout=5)
+            # HEAD skips the response body; Flask answers it for any GET route
+            response = SESSION.head(f"{base_url}/health", timeout=2)
             if response.status_code == 200:
                 print(f"API is ready at {base_url}")
                 return
@@ -219,39 +305,24 @@ def wait_for_api():
         if i < max_retries - 1:
             print(f"Waiting for API to be ready... (attempt {i + 1}/{max_retries})")
             time.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, max_retry_delay)
     
-    pytest.fail(f"API at {base_url} did not become ready within {max_retries * retry_delay} seconds")
+    elapsed = time.monotonic() - start
+    pytest.fail(f"API at {base_url} did not become ready within {elapsed:.0f} seconds")
 
 
+@pytest.mark.skipif(not os.environ.get("TUNNEL_URL"), reason="TUNNEL_URL not provided")
 class TestNgrokIntegration:
     """Tests specific to ngrok integration"""
     
-    def test_tunnel_url_accessible(self):
-        """Test that tunnel URL is accessible if provided"""
-        tunnel_url = os.environ.get("TUNNEL_URL")
-        if not tunnel_url:
-            pytest.skip("TUNNEL_URL not provided")
+    def test_tunnel_health(self):
+        """Test that the tunnel URL is accessible and carries ngrok headers"""
+        tunnel_url = os.environ["TUNNEL_URL"]
         
-        response = requests.get(f"{tunnel_url}/health", timeout=10)
+        # The session verifies certificates, so this also checks HTTPS tunnels
+        response = SESSION.get(f"{tunnel_url}/health", timeout=5)
         assert response.status_code == 200
         
-        # Test HTTPS
-        if tunnel_url.startswith("https://"):
-            # Verify SSL certificate (ngrok provides valid certs)
-            response = requests.get(f"{tunnel_url}/health", verify=True)
-            assert response.status_code == 200
-    
-    def test_tunnel_headers(self):
-        """Test that ngrok headers are present"""
-        tunnel_url = os.environ.get("TUNNEL_URL")
-        if not tunnel_url:
-            pytest.skip("TUNNEL_URL not provided")
-        
-        response = requests.get(f"{tunnel_url}/health")
-        
-        # ngrok typically adds these headers
-        headers = response.headers
-        
         # Check for common ngrok headers (may vary)
         expected_headers = [
             "ngrok-trace-id",
@@ -260,10 +331,7 @@ class TestNgrokIntegration:
         ]
         
         # At least one ngrok header should be present
-        ngrok_headers_found = any(
-            header.lower() in [h.lower() for h in headers.keys()]
-            for header in expected_headers
-        )
+        ngrok_headers_found = any(header in response.headers for header in expected_headers)
         
         if not ngrok_headers_found:
             print("Warning: No ngrok headers detected. This might not be a tunnel URL.")
@@ -5,15 +5,39 @@ This script receives deployment notifications from GitHub Actions
 and triggers deployments on your server.
 """
 
-from flask import Flask, request, jsonify
+from collections import OrderedDict, deque
+from flask import Flask, request
+from flask.json.provider import JSONProvider
+from werkzeug.exceptions import RequestEntityTooLarge
 import subprocess
 import os
 import logging
+import functools
 import hmac
 import hashlib
-import json
+import orjson
+import re
+import signal
+import threading
+import time
+import uuid
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson; every JSON response goes through it"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of via dumps()
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,21 +53,188 @@ if platform.system() == 'Windows':
 else:
     DEPLOYMENT_SCRIPT = os.environ.get('DEPLOYMENT_SCRIPT', './deploy.sh')
 
-ALLOWED_REPOS = os.environ.get('ALLOWED_REPOS', 'SahilBharodiya/transaction-management-api').split(',')
+ALLOWED_REPOS = frozenset(
+    repo.strip()
+    for repo in os.environ.get('ALLOWED_REPOS', 'SahilBharodiya/transaction-management-api').split(',')
+)
+
+# Deployment scripts are killed after this many seconds
+DEPLOYMENT_TIMEOUT = 600
+# Lines of deployment output kept for the JSON response; all of it is logged
+OUTPUT_TAIL_LINES = 200
+
+# Environment inherited by deployment scripts, captured once at startup
+_BASE_ENV = dict(os.environ)
+
+# Number of deployment jobs kept for /webhook/jobs; unfinished jobs are never dropped
+MAX_DEPLOYMENT_JOBS = 50
+
+# Shape of a GitHub X-Hub-Signature-256 header
+SIGNATURE_PATTERN = re.compile(r'sha256=[0-9a-f]{64}')
+# A "ref" field that is the first key of the payload object, as GitHub sends
+# push events; anything else needs a full parse to find the top-level ref
+REF_PATTERN = re.compile(rb'\s*\{\s*"ref"\s*:\s*"([^"\\]*)"')
+# Branches that trigger a deployment
+DEPLOY_REFS = frozenset(['refs/heads/main', 'refs/heads/master'])
+
+# GitHub caps webhook payloads at 25 MB; refuse anything larger unread
+MAX_PAYLOAD_SIZE = 25 * 1024 * 1024
+# Enforced while reading, so chunked bodies without a Content-Length are capped too
+app.config['MAX_CONTENT_LENGTH'] = MAX_PAYLOAD_SIZE
+
+def json_response(payload, status=200):
+    """JSON response for payload with the given status, built by app.json"""
+    response = app.json.response(payload)
+    response.status_code = status
+    return response
+
+def read_body():
+    """Read the request body, raising RequestEntityTooLarge past MAX_PAYLOAD_SIZE.
+    
+    Werkzeug silently stops a body without a Content-Length at the limit, so
+    probe for one more byte when a body reaches it.
+    """
+    body = request.get_data(cache=False)
+    if len(body) >= MAX_PAYLOAD_SIZE:
+        request.stream.read(1)
+    return body
+
+def kill_process_tree(process):
+    """Kill a process started by run_deployment together with its children."""
+    try:
+        if platform.system() == 'Windows':
+            subprocess.run(
+                ['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                capture_output=True
+            )
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except (OSError, subprocess.SubprocessError):
+        # Already gone, or the tree could not be killed; kill the script at least
+        process.kill()
+
+def run_deployment(cmd, env):
+    """Run a deployment command, logging its output as it is produced.
+    
+    Returns (returncode, last OUTPUT_TAIL_LINES lines of combined output).
+    Raises subprocess.TimeoutExpired if it runs longer than DEPLOYMENT_TIMEOUT.
+    """
+    tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    timed_out = threading.Event()
+    
+    # Run the script in its own process group so a timeout also stops anything it
+    # started; children left running would keep the output pipe open
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        env=env,
+        start_new_session=platform.system() != 'Windows'
+    ) as process:
+        def kill():
+            timed_out.set()
+            kill_process_tree(process)
+        
+        # Enforce the timeout even while blocked reading output
+        timer = threading.Timer(DEPLOYMENT_TIMEOUT, kill)
+        timer.start()
+        try:
+            for line in process.stdout:
+                logger.info(line.rstrip())
+                tail.append(line)
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+    
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, DEPLOYMENT_TIMEOUT, output=''.join(tail))
+    return returncode, ''.join(tail)
+
+# Job states after which a deployment job no longer changes
+FINISHED_JOB_STATES = frozenset(['success', 'failed', 'timeout', 'error'])
+
+# Deployment jobs by id, oldest first
+_JOBS = OrderedDict()
+_JOBS_LOCK = threading.Lock()
+# Deployments restart the same containers, so they run one at a time
+_DEPLOY_LOCK = threading.Lock()
+
+def _update_job(job, **fields):
+    with _JOBS_LOCK:
+        job.update(fields)
+
+def _run_job(job, cmd, env):
+    """Run a deployment job in the background and record its outcome."""
+    with _DEPLOY_LOCK:
+        _update_job(job, status='running')
+        try:
+            returncode, output = run_deployment(cmd, env)
+        except subprocess.TimeoutExpired as e:
+            logger.error(f"Deployment {job['id']} timed out")
+            _update_job(job, status='timeout', output=e.output)
+        except Exception as e:
+            logger.error(f"Deployment {job['id']} error: {str(e)}")
+            _update_job(job, status='error', error=str(e))
+        else:
+            if returncode == 0:
+                logger.info(f"Deployment {job['id']} completed successfully")
+                _update_job(job, status='success', output=output)
+            else:
+                logger.error(f"Deployment {job['id']} failed with exit code {returncode}")
+                _update_job(job, status='failed', returncode=returncode, output=output)
+
+def start_deployment(cmd, env, **details):
+    """Queue a deployment on a background thread and return its job id."""
+    job_id = uuid.uuid4().hex
+    job = dict(details, id=job_id, status='queued')
+    with _JOBS_LOCK:
+        _JOBS[job_id] = job
+        # Forget the oldest finished jobs; queued and running ones stay reachable
+        excess = len(_JOBS) - MAX_DEPLOYMENT_JOBS
+        if excess > 0:
+            finished = [
+                old_id for old_id, old_job in _JOBS.items()
+                if old_job['status'] in FINISHED_JOB_STATES
+            ]
+            for old_id in finished[:excess]:
+                del _JOBS[old_id]
+    
+    threading.Thread(
+        target=_run_job, args=(job, cmd, env), name=f"deploy-{job_id[:8]}", daemon=True
+    ).start()
+    return job_id
+
+def accepted_response(job_id, **fields):
+    """202 response pointing at the status of a queued deployment."""
+    return json_response(dict(
+        fields,
+        status='accepted',
+        job_id=job_id,
+        status_url=f'/webhook/jobs/{job_id}'
+    ), 202)
+
+@functools.lru_cache(maxsize=32)
+def docker_image(repo_name):
+    """GHCR image deployed for a repository."""
+    return f"ghcr.io/{repo_name.lower()}:latest"
+
+@functools.lru_cache(maxsize=8)
+def _hmac_template(secret):
+    """Keyed HMAC-SHA256 to copy per request, so the key setup is done once"""
+    return hmac.new(secret.encode('utf-8'), digestmod=hashlib.sha256)
 
 def verify_github_signature(payload_body, signature_header, secret):
     """Verify the GitHub webhook signature for security."""
-    if not signature_header:
+    if not signature_header or not signature_header.startswith('sha256='):
         return False
     
-    hash_object = hmac.new(
-        secret.encode('utf-8'),
-        msg=payload_body,
-        digestmod=hashlib.sha256
-    )
-    expected_signature = "sha256=" + hash_object.hexdigest()
+    hash_object = _hmac_template(secret).copy()
+    hash_object.update(payload_body)
+    expected_signature = b"sha256=" + hash_object.hexdigest().encode('ascii')
     
-    return hmac.compare_digest(expected_signature, signature_header)
+    return hmac.compare_digest(expected_signature, signature_header.encode('utf-8'))
 
 @app.route('/webhook/github', methods=['POST'])
 def github_webhook():
@@ -52,33 +243,54 @@ def github_webhook():
         # Get the signature
         signature = request.headers.get('X-Hub-Signature-256', '')
         
+        # Reject missing or malformed signatures before reading and hashing the body
+        if WEBHOOK_SECRET and not SIGNATURE_PATTERN.fullmatch(signature):
+            logger.warning("Invalid webhook signature")
+            return json_response({'error': 'Invalid signature'}, 401)
+        
+        body = read_body()
+        
         # Verify signature if secret is configured
         if WEBHOOK_SECRET:
-            if not verify_github_signature(request.data, signature, WEBHOOK_SECRET):
+            if not verify_github_signature(body, signature, WEBHOOK_SECRET):
                 logger.warning("Invalid webhook signature")
-                return jsonify({'error': 'Invalid signature'}), 401
+                return json_response({'error': 'Invalid signature'}, 401)
+        
+        # Skip other branches without parsing the whole payload
+        match = REF_PATTERN.match(body)
+        ref = match.group(1).decode('utf-8', 'replace') if match else ''
+        if match and ref not in DEPLOY_REFS:
+            logger.info(f"Ignoring push to branch: {ref}")
+            return json_response({'message': 'Deployment skipped - not main/master branch'}, 200)
         
         # Get the payload
-        payload = request.get_json()
+        try:
+            payload = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return json_response({'error': 'Invalid JSON payload'}, 400)
         
         if not payload:
-            return jsonify({'error': 'No JSON payload'}), 400
+            return json_response({'error': 'No JSON payload'}, 400)
+        if not isinstance(payload, dict):
+            return json_response({'error': 'JSON payload must be an object'}, 400)
         
         # Check if it's from an allowed repository
-        repo_name = payload.get('repository', {}).get('full_name', '')
+        repository = payload.get('repository')
+        repo_name = repository.get('full_name', '') if isinstance(repository, dict) else ''
         if repo_name not in ALLOWED_REPOS:
             logger.warning(f"Webhook from unauthorized repo: {repo_name}")
-            return jsonify({'error': 'Unauthorized repository'}), 403
+            return json_response({'error': 'Unauthorized repository'}, 403)
         
         # Check if it's a push to main/master branch
         ref = payload.get('ref', '')
-        if ref not in ['refs/heads/main', 'refs/heads/master']:
+        if ref not in DEPLOY_REFS:
             logger.info(f"Ignoring push to branch: {ref}")
-            return jsonify({'message': 'Deployment skipped - not main/master branch'}), 200
+            return json_response({'message': 'Deployment skipped - not main/master branch'}, 200)
         
         # Get commit info
         commit_sha = payload.get('after', '')
-        commit_message = payload.get('head_commit', {}).get('message', '')
+        head_commit = payload.get('head_commit')
+        commit_message = head_commit.get('message', '') if isinstance(head_commit, dict) else ''
         
         logger.info(f"Received deployment webhook from {repo_name}")
         logger.info(f"Commit: {commit_sha[:8]} - {commit_message}")
@@ -88,10 +300,12 @@ def github_webhook():
             logger.info(f"Running deployment script: {DEPLOYMENT_SCRIPT}")
             
             # Set environment variables for the deployment script
-            env = os.environ.copy()
-            env['COMMIT_SHA'] = commit_sha
-            env['REPO_NAME'] = repo_name
-            env['DOCKER_IMAGE'] = f"ghcr.io/{repo_name.lower()}:latest"
+            env = {
+                **_BASE_ENV,
+                'COMMIT_SHA': commit_sha,
+                'REPO_NAME': repo_name,
+                'DOCKER_IMAGE': docker_image(repo_name)
+            }
             
             # Determine command based on script type
             if DEPLOYMENT_SCRIPT.endswith('.ps1'):
@@ -101,64 +315,51 @@ def github_webhook():
                 # Bash script
                 cmd = [DEPLOYMENT_SCRIPT]
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=600,  # 10 minute timeout
-                env=env
+            job_id = start_deployment(cmd, env, commit=commit_sha[:8], repository=repo_name)
+            logger.info(f"Deployment {job_id} queued")
+            return accepted_response(
+                job_id,
+                message='Deployment started',
+                commit=commit_sha[:8]
             )
-            
-            if result.returncode == 0:
-                logger.info("Deployment completed successfully")
-                return jsonify({
-                    'status': 'success',
-                    'message': 'Deployment completed successfully',
-                    'commit': commit_sha[:8],
-                    'output': result.stdout
-                })
-            else:
-                logger.error(f"Deployment failed: {result.stderr}")
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Deployment failed',
-                    'commit': commit_sha[:8],
-                    'error': result.stderr
-                }), 500
         else:
             logger.error(f"Deployment script not found: {DEPLOYMENT_SCRIPT}")
-            return jsonify({
+            return json_response({
                 'status': 'error',
                 'message': f'Deployment script not found: {DEPLOYMENT_SCRIPT}'
-            }), 500
+            }, 500)
             
-    except subprocess.TimeoutExpired:
-        logger.error("Deployment timeout")
-        return jsonify({
-            'status': 'error',
-            'message': 'Deployment timeout (10 minutes)'
-        }), 500
+    except RequestEntityTooLarge:
+        return json_response({'error': 'Payload too large'}, 413)
     except Exception as e:
         logger.error(f"Webhook error: {str(e)}")
-        return jsonify({
+        return json_response({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }, 500)
 
 @app.route('/webhook/manual', methods=['POST'])
 def manual_deployment():
     """Manual deployment endpoint for testing."""
     try:
-        payload = request.get_json() or {}
+        body = read_body()
+        try:
+            payload = orjson.loads(body) if body else {}
+        except orjson.JSONDecodeError:
+            return json_response({'error': 'Invalid JSON payload'}, 400)
+        if not isinstance(payload, dict):
+            payload = {}
         image = payload.get('image', f'ghcr.io/sahilbharodiya/transaction-management-api:latest')
         
         logger.info(f"Manual deployment triggered with image: {image}")
         
         if os.path.exists(DEPLOYMENT_SCRIPT):
-            env = os.environ.copy()
-            env['DOCKER_IMAGE'] = image
-            env['COMMIT_SHA'] = 'manual'
-            env['REPO_NAME'] = 'manual-deployment'
+            env = {
+                **_BASE_ENV,
+                'DOCKER_IMAGE': image,
+                'COMMIT_SHA': 'manual',
+                'REPO_NAME': 'manual-deployment'
+            }
             
             # Determine command based on script type
             if DEPLOYMENT_SCRIPT.endswith('.ps1'):
@@ -168,90 +369,117 @@ def manual_deployment():
                 # Bash script
                 cmd = [DEPLOYMENT_SCRIPT]
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=600,
-                env=env
+            job_id = start_deployment(cmd, env, image=image, repository='manual-deployment')
+            logger.info(f"Manual deployment {job_id} queued")
+            return accepted_response(
+                job_id,
+                message='Manual deployment started',
+                image=image
             )
-            
-            if result.returncode == 0:
-                return jsonify({
-                    'status': 'success',
-                    'message': 'Manual deployment completed',
-                    'image': image,
-                    'output': result.stdout
-                })
-            else:
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Manual deployment failed',
-                    'error': result.stderr
-                }), 500
         else:
-            return jsonify({
+            return json_response({
                 'status': 'error',
                 'message': f'Deployment script not found: {DEPLOYMENT_SCRIPT}'
-            }), 500
+            }, 500)
             
+    except RequestEntityTooLarge:
+        return json_response({'error': 'Payload too large'}, 413)
     except Exception as e:
         logger.error(f"Manual deployment error: {str(e)}")
-        return jsonify({
+        return json_response({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }, 500)
+
+@app.route('/webhook/jobs/<job_id>', methods=['GET'])
+def deployment_job(job_id):
+    """Status and output of a queued deployment."""
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+        job = dict(job) if job is not None else None
+    
+    if job is None:
+        return json_response({'error': 'Deployment job not found'}, 404)
+    return json_response(job)
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({
+    return json_response({
         'status': 'healthy',
         'service': 'webhook-receiver',
         'deployment_script': DEPLOYMENT_SCRIPT,
         'script_exists': os.path.exists(DEPLOYMENT_SCRIPT)
     })
 
+# Docker probe results are reused for this many seconds, so frequent polling
+# of /status does not fork two docker commands per request
+STATUS_CACHE_TTL = 3.0
+_STATUS_CACHE = {'time': 0.0, 'value': None}
+_STATUS_LOCK = threading.Lock()
+
+def probe_docker():
+    """Check whether Docker and the API container are running."""
+    # Check if Docker is running
+    docker_running = False
+    try:
+        subprocess.run(['docker', 'info'], capture_output=True, timeout=2)
+        docker_running = True
+    except:
+        pass
+    
+    # Check if the API container is running
+    api_running = False
+    try:
+        result = subprocess.run(
+            ['docker', 'ps', '--filter', 'name=transaction-api', '--format', '{{.Names}}'],
+            capture_output=True,
+            text=True,
+            timeout=2
+        )
+        api_running = 'transaction-api' in result.stdout
+    except:
+        pass
+    
+    return {'docker_running': docker_running, 'api_container_running': api_running}
+
+def cached_docker_status():
+    """Docker probe results, refreshed at most once per STATUS_CACHE_TTL."""
+    cached = _STATUS_CACHE['value']
+    if cached is not None and time.monotonic() - _STATUS_CACHE['time'] < STATUS_CACHE_TTL:
+        return cached
+    
+    # Only one request refreshes; others keep serving the stale result meanwhile
+    if not _STATUS_LOCK.acquire(blocking=cached is None):
+        return cached
+    try:
+        if _STATUS_CACHE['value'] is None or time.monotonic() - _STATUS_CACHE['time'] >= STATUS_CACHE_TTL:
+            _STATUS_CACHE['value'] = probe_docker()
+            _STATUS_CACHE['time'] = time.monotonic()
+        return _STATUS_CACHE['value']
+    finally:
+        _STATUS_LOCK.release()
+
 @app.route('/status', methods=['GET'])
 def deployment_status():
     """Get deployment status."""
     try:
         # Check if deployment script exists
         script_exists = os.path.exists(DEPLOYMENT_SCRIPT)
+        docker_status = cached_docker_status()
         
-        # Check if Docker is running
-        docker_running = False
-        try:
-            subprocess.run(['docker', 'info'], capture_output=True, timeout=5)
-            docker_running = True
-        except:
-            pass
-        
-        # Check if the API container is running
-        api_running = False
-        try:
-            result = subprocess.run(
-                ['docker', 'ps', '--filter', 'name=transaction-api', '--format', '{{.Names}}'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            api_running = 'transaction-api' in result.stdout
-        except:
-            pass
-        
-        return jsonify({
+        return json_response({
             'deployment_script_exists': script_exists,
-            'docker_running': docker_running,
-            'api_container_running': api_running,
-            'allowed_repos': ALLOWED_REPOS,
+            'docker_running': docker_status['docker_running'],
+            'api_container_running': docker_status['api_container_running'],
+            'allowed_repos': sorted(ALLOWED_REPOS),
             'webhook_secret_configured': bool(WEBHOOK_SECRET)
         })
         
     except Exception as e:
-        return jsonify({
+        return json_response({
             'error': str(e)
-        }), 500
+        }, 500)
 
 if __name__ == '__main__':
     port = int(os.environ.get('WEBHOOK_PORT', 5001))
@@ -259,6 +487,31 @@ if __name__ == '__main__':
     
     logger.info(f"Starting webhook receiver on port {port}")
     logger.info(f"Deployment script: {DEPLOYMENT_SCRIPT}")
-    logger.info(f"Allowed repositories: {ALLOWED_REPOS}")
+    logger.info(f"Allowed repositories: {', '.join(sorted(ALLOWED_REPOS))}")
     
-    app.run(host='0.0.0.0', port=port, debug=debug)
+    if debug:
+        app.run(host='0.0.0.0', port=port, debug=debug)
+    elif platform.system() == 'Windows':
+        try:
+            from waitress import serve
+        except ImportError:
+            logger.warning("waitress is not installed; falling back to the Flask server")
+            app.run(host='0.0.0.0', port=port)
+        else:
+            serve(app, host='0.0.0.0', port=port, threads=8)
+    else:
+        # One worker, since deployment jobs live in process memory; threads keep
+        # /health and /status responsive while a deployment runs
+        try:
+            os.execvp('gunicorn', [
+                'gunicorn',
+                '--bind', f'0.0.0.0:{port}',
+                '--chdir', os.path.dirname(os.path.abspath(__file__)),
+                '--workers', '1',
+                '--worker-class', 'gthread',
+                '--threads', '8',
+                'webhook-receiver:app'
+            ])
+        except FileNotFoundError:
+            logger.warning("gunicorn is not installed; falling back to the Flask server")
+            app.run(host='0.0.0.0', port=port)